@@ -1,4 +1,5 @@
 from datetime import datetime
+from itertools import islice
 
 from utils.file_handler import read_sales_data
 
@@ -11,37 +12,61 @@ from utils.data_processor import customer_analysis
 from utils.data_processor import daily_sales_trend
 from utils.data_processor import find_peak_sales_day
 from utils.data_processor import low_performing_products
+from utils.data_processor import analyze_sales
 from utils.data_processor import enrich_sales_data
+from utils.data_processor import summarize_enrichment
 
 from utils.api_handler import fetch_all_products
 from utils.api_handler import create_product_mapping
 
 
+# Report separator lines, built once at import time
+SEP_EQ = "=" * 44 + "\n"
+SEP_DASH = "-" * 44 + "\n"
 
-def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt'):
+# Row templates for the report tables, bound once at import time
+REGION_ROW_FMT = "{:<9} ₹{:>12,.2f}   {:>8.2f}%       {}\n".format
+PRODUCT_ROW_FMT = "{:<5} {:<28} {:>8}   ₹{:>10,.2f}\n".format
+CUSTOMER_ROW_FMT = "{:<5} {:<13} ₹{:>12,.2f}   {}\n".format
+DAILY_ROW_FMT = "{:<12} ₹{:>12,.2f}   {:>12}   {}\n".format
+LOW_PRODUCT_FMT = "- {}: {} units sold, ₹{:,.2f}\n".format
+REGION_AVG_FMT = "- {}: ₹{:,.2f}\n".format
+FAILED_PRODUCT_FMT = "- {}\n".format
+
+
+def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt',
+                          total_revenue=None, region_stats=None, top_products=None,
+                          customer_stats=None, daily_trend=None, peak_day=None,
+                          low_products=None, success_count=None, failed_products=None):
     """
     Generates a comprehensive formatted text report
+
+    Analysis results already computed by the caller can be passed in
+    so they are not recalculated; any that are missing are computed here.
     """
 
     try:
-        with open(output_file, 'w', encoding='utf-8') as file:
+        with open(output_file, 'w', encoding='utf-8', buffering=1024 * 1024) as file:
+            out = []
 
             # =========================
             # 1. HEADER
             # =========================
-            file.write("=" * 44 + "\n")
-            file.write("          SALES ANALYTICS REPORT\n")
-            file.write(f"    Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            file.write(f"    Records Processed: {len(transactions)}\n")
-            file.write("=" * 44 + "\n\n")
+            out.append(SEP_EQ)
+            out.append("          SALES ANALYTICS REPORT\n")
+            out.append(f"    Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            out.append(f"    Records Processed: {len(transactions)}\n")
+            out.append(SEP_EQ)
+            out.append("\n")
 
             # =========================
             # 2. OVERALL SUMMARY
             # =========================
-            file.write("OVERALL SUMMARY\n")
-            file.write("-" * 44 + "\n")
+            out.append("OVERALL SUMMARY\n")
+            out.append(SEP_DASH)
 
-            total_revenue = calculate_total_revenue(transactions)
+            if total_revenue is None:
+                total_revenue = calculate_total_revenue(transactions)
             total_transactions = len(transactions)
 
             avg_order_value = (
@@ -49,186 +74,176 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
                 if total_transactions > 0 else 0
             )
 
-            dates = [tx["Date"] for tx in transactions]
+            # Track the date range in one pass without building a list of dates
+            min_date = None
+            max_date = None
+            for tx in transactions:
+                date = tx["Date"]
+                if min_date is None or date < min_date:
+                    min_date = date
+                if max_date is None or date > max_date:
+                    max_date = date
+
             date_range = (
-                f"{min(dates)} to {max(dates)}"
-                if dates else "N/A"
+                f"{min_date} to {max_date}"
+                if min_date is not None else "N/A"
             )
 
-            file.write(f"Total Revenue:        ₹{total_revenue:,.2f}\n")
-            file.write(f"Total Transactions:   {total_transactions}\n")
-            file.write(f"Average Order Value:  ₹{avg_order_value:,.2f}\n")
-            file.write(f"Date Range:           {date_range}\n\n")
+            out.append(f"Total Revenue:        ₹{total_revenue:,.2f}\n")
+            out.append(f"Total Transactions:   {total_transactions}\n")
+            out.append(f"Average Order Value:  ₹{avg_order_value:,.2f}\n")
+            out.append(f"Date Range:           {date_range}\n\n")
 
             # =========================
             # 3. REGION-WISE PERFORMANCE
             # =========================
-            from utils.data_processor import region_wise_sales
-
-            file.write("REGION-WISE PERFORMANCE\n")
-            file.write("-" * 44 + "\n")
-            file.write("Region    Sales           % of Total   Transactions\n")
+            out.append("REGION-WISE PERFORMANCE\n")
+            out.append(SEP_DASH)
+            out.append("Region    Sales           % of Total   Transactions\n")
 
-            region_stats = region_wise_sales(transactions)
+            if region_stats is None:
+                region_stats = region_wise_sales(transactions)
 
             for region, stats in region_stats.items():
-                file.write(
-                    f"{region:<9} "
-                    f"₹{stats['total_sales']:>12,.2f}   "
-                    f"{stats['percentage']:>8.2f}%       "
-                    f"{stats['transaction_count']}\n"
-                )
+                out.append(REGION_ROW_FMT(
+                    region,
+                    stats['total_sales'],
+                    stats['percentage'],
+                    stats['transaction_count']
+                ))
 
-            file.write("\n")
+            out.append("\n")
 
             # =========================
             # 4. TOP 5 PRODUCTS
             # =========================
-            from utils.data_processor import top_selling_products
-
-            file.write("TOP 5 PRODUCTS\n")
-            file.write("-" * 44 + "\n")
-            file.write("Rank  Product Name                 Quantity   Revenue\n")
+            out.append("TOP 5 PRODUCTS\n")
+            out.append(SEP_DASH)
+            out.append("Rank  Product Name                 Quantity   Revenue\n")
 
-            top_products = top_selling_products(transactions, n=5)
+            if top_products is None:
+                top_products = top_selling_products(transactions, n=5)
 
             rank = 1
             for product_name, quantity, revenue in top_products:
-                file.write(
-                    f"{rank:<5} "
-                    f"{product_name:<28} "
-                    f"{quantity:>8}   "
-                    f"₹{revenue:>10,.2f}\n"
-                )
+                out.append(PRODUCT_ROW_FMT(rank, product_name, quantity, revenue))
                 rank += 1
 
-            file.write("\n")
+            out.append("\n")
 
             # =========================
             # 5. TOP 5 CUSTOMERS
             # =========================
-            from utils.data_processor import customer_analysis
+            out.append("TOP 5 CUSTOMERS\n")
+            out.append(SEP_DASH)
+            out.append("Rank  Customer ID   Total Spent      Orders\n")
 
-            file.write("TOP 5 CUSTOMERS\n")
-            file.write("-" * 44 + "\n")
-            file.write("Rank  Customer ID   Total Spent      Orders\n")
-
-            customer_stats = customer_analysis(transactions)
+            if customer_stats is None:
+                customer_stats = customer_analysis(transactions, top_n=5)
 
+            # Callers may pass the full customer_analysis result, so only
+            # the first five ranked customers are listed
             rank = 1
-            for customer_id, stats in customer_stats.items():
-                if rank > 5:
-                    break
-
-                file.write(
-                    f"{rank:<5} "
-                    f"{customer_id:<13} "
-                    f"₹{stats['total_spent']:>12,.2f}   "
-                    f"{stats['purchase_count']}\n"
-                )
+            for customer_id, stats in islice(customer_stats.items(), 5):
+                out.append(CUSTOMER_ROW_FMT(
+                    rank,
+                    customer_id,
+                    stats['total_spent'],
+                    stats['purchase_count']
+                ))
                 rank += 1
 
-            file.write("\n")
+            out.append("\n")
             # =========================
             # 6. DAILY SALES TREND
             # =========================
-            from utils.data_processor import daily_sales_trend
+            out.append("DAILY SALES TREND\n")
+            out.append(SEP_DASH)
+            out.append("Date         Revenue          Transactions   Customers\n")
 
-            file.write("DAILY SALES TREND\n")
-            file.write("-" * 44 + "\n")
-            file.write("Date         Revenue          Transactions   Customers\n")
-
-            daily_trend = daily_sales_trend(transactions)
+            if daily_trend is None:
+                daily_trend = daily_sales_trend(transactions)
 
             for date, stats in daily_trend.items():
-                file.write(
-                    f"{date:<12} "
-                    f"₹{stats['revenue']:>12,.2f}   "
-                    f"{stats['transaction_count']:>12}   "
-                    f"{stats['unique_customers']}\n"
-                )
+                out.append(DAILY_ROW_FMT(
+                    date,
+                    stats['revenue'],
+                    stats['transaction_count'],
+                    stats['unique_customers']
+                ))
 
-            file.write("\n")
+            out.append("\n")
 
             # =========================
             # 7. PRODUCT PERFORMANCE ANALYSIS
             # =========================
-            from utils.data_processor import (
-                find_peak_sales_day,
-                low_performing_products,
-                region_wise_sales
-            )
-
-            file.write("PRODUCT PERFORMANCE ANALYSIS\n")
-            file.write("-" * 44 + "\n")
+            out.append("PRODUCT PERFORMANCE ANALYSIS\n")
+            out.append(SEP_DASH)
 
             # Best selling day
-            peak_date, peak_revenue, peak_tx_count = find_peak_sales_day(transactions)
-            file.write(f"Best Selling Day: {peak_date} (₹{peak_revenue:,.2f}, {peak_tx_count} transactions)\n\n")
+            if peak_day is None:
+                peak_day = find_peak_sales_day(transactions)
+            peak_date, peak_revenue, peak_tx_count = peak_day
+            out.append(f"Best Selling Day: {peak_date} (₹{peak_revenue:,.2f}, {peak_tx_count} transactions)\n\n")
 
             # Low performing products
-            low_products = low_performing_products(transactions)
+            if low_products is None:
+                low_products = low_performing_products(transactions)
 
             if low_products:
-                file.write("Low Performing Products:\n")
+                out.append("Low Performing Products:\n")
                 for product, qty, revenue in low_products:
-                    file.write(
-                        f"- {product}: {qty} units sold, ₹{revenue:,.2f}\n"
-                    )
+                    out.append(LOW_PRODUCT_FMT(product, qty, revenue))
             else:
-                file.write("Low Performing Products: None\n")
+                out.append("Low Performing Products: None\n")
 
-            file.write("\n")
+            out.append("\n")
 
             # Average transaction value per region
-            file.write("Average Transaction Value per Region:\n")
-
-            region_stats = region_wise_sales(transactions)
+            out.append("Average Transaction Value per Region:\n")
 
             for region, stats in region_stats.items():
                 avg_value = (
                     stats['total_sales'] / stats['transaction_count']
                     if stats['transaction_count'] > 0 else 0
                 )
-                file.write(f"- {region}: ₹{avg_value:,.2f}\n")
+                out.append(REGION_AVG_FMT(region, avg_value))
 
-            file.write("\n")
+            out.append("\n")
 
             # =========================
             # 8. API ENRICHMENT SUMMARY
             # =========================
-            file.write("API ENRICHMENT SUMMARY\n")
-            file.write("-" * 44 + "\n")
+            out.append("API ENRICHMENT SUMMARY\n")
+            out.append(SEP_DASH)
 
             total_records = len(enriched_transactions)
-            successful = [tx for tx in enriched_transactions if tx.get("API_Match") is True]
-            failed = [tx for tx in enriched_transactions if tx.get("API_Match") is False]
 
-            success_count = len(successful)
-            failure_count = len(failed)
+            if success_count is None or failed_products is None:
+                success_count, failed_products = summarize_enrichment(enriched_transactions)
+
+            failure_count = total_records - success_count
 
             success_rate = (
                 (success_count / total_records) * 100
                 if total_records > 0 else 0
             )
 
-            file.write(f"Total Records Enriched: {total_records}\n")
-            file.write(f"Successful Enrichments: {success_count}\n")
-            file.write(f"Failed Enrichments:     {failure_count}\n")
-            file.write(f"Success Rate:           {success_rate:.2f}%\n\n")
+            out.append(f"Total Records Enriched: {total_records}\n")
+            out.append(f"Successful Enrichments: {success_count}\n")
+            out.append(f"Failed Enrichments:     {failure_count}\n")
+            out.append(f"Success Rate:           {success_rate:.2f}%\n\n")
 
-            if failed:
-                file.write("Products That Could Not Be Enriched:\n")
-                unique_failed_products = sorted(
-                    set(tx.get("ProductName") for tx in failed)
-                )
-                for product in unique_failed_products:
-                    file.write(f"- {product}\n")
+            if failed_products:
+                out.append("Products That Could Not Be Enriched:\n")
+                out.extend(map(FAILED_PRODUCT_FMT, sorted(failed_products)))
             else:
-                file.write("All products were successfully enriched.\n")
+                out.append("All products were successfully enriched.\n")
 
-            file.write("\n")
+            out.append("\n")
 
+            # Emit the whole report with a single write
+            file.write("".join(out))
 
         print(f"Sales report generated at {output_file}")
 
@@ -237,10 +252,7 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
 
 def main():
     try:
-        print("=" * 40)
-        print("SALES ANALYTICS SYSTEM")
-        print("=" * 40)
-        print()
+        print("=" * 40 + "\nSALES ANALYTICS SYSTEM\n" + "=" * 40 + "\n")
 
         # 1/10 Read sales data
         print("[1/10] Reading sales data...")
@@ -252,15 +264,34 @@ def main():
         transactions = parse_transactions(raw_lines)
         print(f"✓ Parsed {len(transactions)} records\n")
 
-        # 3/10 Filter options
-        print("[3/10] Filter Options Available:")
-        regions = sorted(set(tx["Region"] for tx in transactions))
-        amounts = [tx["Quantity"] * tx["UnitPrice"] for tx in transactions]
-        min_amount = min(amounts) if amounts else 0
-        max_amount = max(amounts) if amounts else 0
+        # The raw lines are not needed once parsed; release them so they
+        # are not held through analysis, enrichment and the report
+        del raw_lines
 
-        print(f"Regions: {', '.join(regions)}")
-        print(f"Amount Range: ₹{min_amount:,.2f} - ₹{max_amount:,.2f}")
+        # 3/10 Filter options
+        # Collect regions and the amount range in one pass
+        # without building a list of amounts
+        available_regions = set()
+        min_amount = None
+        max_amount = None
+        for tx in transactions:
+            available_regions.add(tx["Region"])
+            amount = tx["Quantity"] * tx["UnitPrice"]
+            if min_amount is None or amount < min_amount:
+                min_amount = amount
+            if max_amount is None or amount > max_amount:
+                max_amount = amount
+
+        if min_amount is None:
+            min_amount = max_amount = 0
+
+        regions = sorted(available_regions)
+
+        print(
+            "[3/10] Filter Options Available:\n"
+            f"Regions: {', '.join(regions)}\n"
+            f"Amount Range: ₹{min_amount:,.2f} - ₹{max_amount:,.2f}"
+        )
 
         choice = input("Do you want to filter data? (y/n): ").strip().lower()
 
@@ -283,18 +314,14 @@ def main():
             transactions, invalid_count, summary = validate_and_filter(transactions)
 
         # 4/10 Validation summary
-        print("\n[4/10] Validation complete")
-        print(f"✓ Valid records: {len(transactions)} | Invalid records: {invalid_count}\n")
+        print(
+            "\n[4/10] Validation complete\n"
+            f"✓ Valid records: {len(transactions)} | Invalid records: {invalid_count}\n"
+        )
 
         # 5/10 Analysis
         print("[5/10] Analyzing sales data...")
-        calculate_total_revenue(transactions)
-        region_wise_sales(transactions)
-        top_selling_products(transactions)
-        customer_analysis(transactions)
-        daily_sales_trend(transactions)
-        find_peak_sales_day(transactions)
-        low_performing_products(transactions)
+        sales_analysis = analyze_sales(transactions, top_customers=5)
         print("✓ Analysis complete\n")
 
         # 6/10 API fetch
@@ -306,22 +333,32 @@ def main():
         # 7/10 Enrichment
         print("[7/10] Enriching sales data...")
         enriched_transactions = enrich_sales_data(transactions, product_mapping)
-        matched = len([tx for tx in enriched_transactions if tx.get("API_Match")])
+        matched, failed_products = summarize_enrichment(enriched_transactions)
         total = len(enriched_transactions)
         print(f"✓ Enriched {matched}/{total} transactions\n")
 
         # 8/10 Save enriched data
-        print("[8/10] Saving enriched data...")
-        print("✓ Saved to: data/enriched_sales_data.txt\n")
+        print("[8/10] Saving enriched data...\n✓ Saved to: data/enriched_sales_data.txt\n")
 
         # 9/10 Report
         print("[9/10] Generating report...")
-        generate_sales_report(transactions, enriched_transactions)
+        generate_sales_report(
+            transactions,
+            enriched_transactions,
+            total_revenue=sales_analysis["total_revenue"],
+            region_stats=sales_analysis["region_stats"],
+            top_products=sales_analysis["top_products"],
+            customer_stats=sales_analysis["customer_stats"],
+            daily_trend=sales_analysis["daily_trend"],
+            peak_day=sales_analysis["peak_day"],
+            low_products=sales_analysis["low_products"],
+            success_count=matched,
+            failed_products=failed_products
+        )
         print("✓ Report saved to: output/sales_report.txt\n")
 
         # 10/10 Done
-        print("[10/10] Process Complete!")
-        print("=" * 40)
+        print("[10/10] Process Complete!\n" + "=" * 40)
 
     except Exception as e:
         print("An error occurred during execution.")
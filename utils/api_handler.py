@@ -1,36 +1,163 @@
+import json
+import os
+import time
+
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; fall back to the standard library parser
+    orjson = None
+
+API_URL = "https://dummyjson.com/products"
+PAGE_SIZE = 100
+MAX_WORKERS = 8
+
+CACHE_FILE = "data/products_cache.json"
+CACHE_TTL = 3600  # seconds
+
+# Only the fields create_product_mapping reads are kept in the cache
+CACHED_FIELDS = ("id", "title", "category", "brand", "rating")
+
+# Shared session so page requests reuse pooled keep-alive connections
+session = requests.Session()
+session.mount(
+    "https://",
+    HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+)
+
+def decode_json(raw):
+    """
+    Decodes JSON bytes, using orjson when it is installed
+
+    Returns: decoded Python object
+    """
+
+    if orjson is not None:
+        return orjson.loads(raw)
+
+    return json.loads(raw)
+
+def fetch_product_page(skip):
+    """
+    Fetches one page of products from DummyJSON API
+
+    Returns: dictionary with the decoded JSON response
+    """
+
+    response = session.get(API_URL, params={"limit": PAGE_SIZE, "skip": skip})
+    response.raise_for_status()
+
+    return decode_json(response.content)
+
+def load_cached_products(cache_file=CACHE_FILE, ttl=CACHE_TTL):
+    """
+    Loads products from the local cache file if it is fresh
+
+    Returns: list of product dictionaries, or None if the cache
+    is missing, older than ttl seconds, unreadable, malformed or
+    was fetched from a different API_URL or PAGE_SIZE
+    """
+
+    try:
+        if time.time() - os.path.getmtime(cache_file) >= ttl:
+            return None
+
+        with open(cache_file, 'rb') as file:
+            cache = decode_json(file.read())
+
+    except (OSError, ValueError):
+        return None
+
+    # Anything other than a cache written for the current endpoint
+    # is treated as a miss
+    if not isinstance(cache, dict):
+        return None
+
+    if cache.get("url") != API_URL or cache.get("page_size") != PAGE_SIZE:
+        return None
+
+    products = cache.get("products")
+
+    if not isinstance(products, list):
+        return None
+
+    if not all(isinstance(product, dict) for product in products):
+        return None
+
+    return products
+
+def save_cached_products(products, cache_file=CACHE_FILE):
+    """
+    Saves products to the local cache file
+
+    Only CACHED_FIELDS are stored, together with the API_URL and
+    PAGE_SIZE they were fetched with. Writes to a temporary file first
+    and swaps it in with os.replace so a partially written cache is
+    never read.
+    """
+
+    cache = {
+        "url": API_URL,
+        "page_size": PAGE_SIZE,
+        "products": [
+            {field: product.get(field) for field in CACHED_FIELDS}
+            for product in products
+        ]
+    }
+
+    temp_file = cache_file + ".tmp"
+
+    try:
+        with open(temp_file, 'w', encoding='utf-8') as file:
+            json.dump(cache, file)
+
+        os.replace(temp_file, cache_file)
+
+    except OSError as e:
+        print("Could not write product cache:", e)
 
 def fetch_all_products():
     """
     Fetches all products from DummyJSON API
 
+    Uses the local cache when it is fresh and refreshes it after
+    a successful fetch.
+
     Returns: list of product dictionaries
     """
 
-    url = "https://dummyjson.com/products?limit=100"
+    products = load_cached_products()
 
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
+    if products is not None:
+        print("Loaded products from cache. Products loaded:", len(products))
+        return products
 
-        data = response.json()
+    try:
+        # First page also tells us how many products exist in total
+        data = fetch_product_page(0)
         products = data.get("products", [])
+        total = data.get("total", len(products))
 
-        print("API fetch successful. Products fetched:", len(products))
+        # Fetch the remaining pages concurrently over the shared session
+        remaining_pages = range(PAGE_SIZE, total, PAGE_SIZE)
+
+        if remaining_pages:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                for page in executor.map(fetch_product_page, remaining_pages):
+                    products.extend(page.get("products", []))
 
-        simplified_products = []
+        print("API fetch successful. Products fetched:", len(products))
 
-        for product in products:
-            simplified_products.append({
-                "id": product.get("id"),
-                "title": product.get("title"),
-                "category": product.get("category"),
-                "brand": product.get("brand"),
-                "price": product.get("price"),
-                "rating": product.get("rating")
-            })
+        if products:
+            save_cached_products(products)
 
-        return simplified_products
+        # Raw API records are returned as-is; create_product_mapping
+        # picks out the fields it needs in a single pass
+        return products
 
     except Exception as e:
         print("API fetch failed:", e)
@@ -43,16 +170,14 @@ def create_product_mapping(api_products):
     Returns: dictionary mapping product IDs to info
     """
 
-    product_mapping = {}
-
-    for product in api_products:
-        product_id = product.get("id")
-
-        product_mapping[product_id] = {
+    product_mapping = {
+        product.get("id"): {
             "title": product.get("title"),
             "category": product.get("category"),
             "brand": product.get("brand"),
             "rating": product.get("rating")
         }
+        for product in api_products
+    }
 
     return product_mapping
@@ -1,3 +1,13 @@
+import heapq
+from sys import intern
+
+# Fields every transaction must have to pass validation
+REQUIRED_FIELDS = frozenset([
+    "TransactionID", "Date", "ProductID", "ProductName",
+    "Quantity", "UnitPrice", "CustomerID", "Region"
+])
+
+
 def split_sales_data(lines):
     """
     Splits raw file lines into columns using | delimiter.
@@ -71,15 +81,16 @@ def clean_sales_data(split_rows):
         product_name = product_name.replace(",", "")
 
         # Store cleaned record as dictionary
+        # (repeated text fields are interned so rows share one string each)
         record = {
             "TransactionID": transaction_id,
-            "Date": date,
-            "ProductID": product_id,
-            "ProductName": product_name,
+            "Date": intern(date),
+            "ProductID": intern(product_id),
+            "ProductName": intern(product_name),
             "Quantity": quantity,
             "UnitPrice": unit_price,
-            "CustomerID": customer_id,
-            "Region": region
+            "CustomerID": intern(customer_id),
+            "Region": intern(region)
         }
 
         valid_records.append(record)
@@ -101,46 +112,37 @@ def parse_transactions(raw_lines):
     transactions = []
 
     for line in raw_lines:
-        # Split by pipe delimiter
-        parts = line.split("|")
-
-        # Skip rows with incorrect number of fields
-        if len(parts) != 8:
+        try:
+            # Split by pipe delimiter straight into the eight fields;
+            # rows with the wrong number of fields raise ValueError
+            # (no maxsplit, which would let extra fields into Region)
+            (transaction_id, date, product_id, product_name,
+             quantity, unit_price, customer_id, region) = line.split("|")
+
+            # Clean numeric fields (remove commas) and convert data types;
+            # replace returns the field itself when it has no comma,
+            # which is cheaper than translate for these short strings
+            quantity = int(quantity.replace(",", ""))
+            unit_price = float(unit_price.replace(",", ""))
+        except ValueError:
+            # Skip rows with incorrect field count or invalid numeric data
             continue
 
-        transaction_id = parts[0]
-        date = parts[1]
-        product_id = parts[2]
-        product_name = parts[3]
-        quantity = parts[4]
-        unit_price = parts[5]
-        customer_id = parts[6]
-        region = parts[7]
-
         # Clean ProductName (remove commas)
         product_name = product_name.replace(",", "")
 
-        # Clean numeric fields (remove commas)
-        quantity = quantity.replace(",", "")
-        unit_price = unit_price.replace(",", "")
-
-        # Convert data types
-        try:
-            quantity = int(quantity)
-            unit_price = float(unit_price)
-        except ValueError:
-            # Skip rows with invalid numeric data
-            continue
-
+        # Date, product, customer and region values repeat across rows;
+        # interning stores each distinct value once and lets the
+        # grouping dicts match keys by identity
         transaction = {
             "TransactionID": transaction_id,
-            "Date": date,
-            "ProductID": product_id,
-            "ProductName": product_name,
+            "Date": intern(date),
+            "ProductID": intern(product_id),
+            "ProductName": intern(product_name),
             "Quantity": quantity,
             "UnitPrice": unit_price,
-            "CustomerID": customer_id,
-            "Region": region
+            "CustomerID": intern(customer_id),
+            "Region": intern(region)
         }
 
         transactions.append(transaction)
@@ -157,72 +159,71 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
 
     total_input = len(transactions)
 
-    # Collect regions and transaction amounts for display
-    available_regions = set()
-    amounts = []
+    filtered_by_region = 0
+    filtered_by_amount = 0
+    filter_by_amount = min_amount is not None or max_amount is not None
 
-    for tx in transactions:
-        available_regions.add(tx.get("Region"))
-        amounts.append(tx.get("Quantity", 0) * tx.get("UnitPrice", 0))
+    # Parsed regions are interned, so interning the filter value lets
+    # matching rows compare equal by identity
+    if region:
+        region = intern(region)
 
-    print("Available regions:", sorted(available_regions))
-    if amounts:
-        print("Transaction amount range:", min(amounts), "to", max(amounts))
+    # Regions and amount range are collected for display
+    available_regions = set()
+    lowest_amount = None
+    highest_amount = None
 
-    # ---------------- VALIDATION ----------------
+    # Display stats, validation and both filters share a single pass
     for tx in transactions:
-        # Required fields check
-        required_fields = [
-            "TransactionID", "Date", "ProductID", "ProductName",
-            "Quantity", "UnitPrice", "CustomerID", "Region"
-        ]
+        available_regions.add(tx.get("Region"))
+        amount = tx.get("Quantity", 0) * tx.get("UnitPrice", 0)
 
-        if not all(field in tx for field in required_fields):
-            invalid_count += 1
-            continue
+        if lowest_amount is None or amount < lowest_amount:
+            lowest_amount = amount
+        if highest_amount is None or amount > highest_amount:
+            highest_amount = amount
 
-        if tx["Quantity"] <= 0 or tx["UnitPrice"] <= 0:
+        # ---------------- VALIDATION ----------------
+        # Required fields check as a single superset test on the keys
+        if not tx.keys() >= REQUIRED_FIELDS:
             invalid_count += 1
             continue
 
-        if not tx["TransactionID"].startswith("T"):
+        # Positive quantity/price and ID prefixes in one condition;
+        # the prefixes are checked by comparing the first character,
+        # which is cheaper than calling startswith for each ID
+        if (tx["Quantity"] <= 0 or tx["UnitPrice"] <= 0
+                or tx["TransactionID"][:1] != "T"
+                or tx["ProductID"][:1] != "P"
+                or tx["CustomerID"][:1] != "C"):
             invalid_count += 1
             continue
 
-        if not tx["ProductID"].startswith("P"):
-            invalid_count += 1
+        # ---------------- REGION FILTER ----------------
+        if region and tx["Region"] != region:
+            filtered_by_region += 1
             continue
 
-        if not tx["CustomerID"].startswith("C"):
-            invalid_count += 1
-            continue
+        # ---------------- AMOUNT FILTER ----------------
+        # (amount was already computed above for the display range)
+        if filter_by_amount:
+            if min_amount is not None and amount < min_amount:
+                filtered_by_amount += 1
+                continue
+            if max_amount is not None and amount > max_amount:
+                filtered_by_amount += 1
+                continue
 
         valid_transactions.append(tx)
 
-    filtered_by_region = 0
-    filtered_by_amount = 0
+    print("Available regions:", sorted(available_regions))
+    if lowest_amount is not None:
+        print("Transaction amount range:", lowest_amount, "to", highest_amount)
 
-    # ---------------- REGION FILTER ----------------
     if region:
-        before = len(valid_transactions)
-        valid_transactions = [tx for tx in valid_transactions if tx["Region"] == region]
-        filtered_by_region = before - len(valid_transactions)
-        print("After region filter:", len(valid_transactions))
-
-    # ---------------- AMOUNT FILTER ----------------
-    if min_amount is not None or max_amount is not None:
-        before = len(valid_transactions)
+        print("After region filter:", len(valid_transactions) + filtered_by_amount)
 
-        def in_range(tx):
-            amount = tx["Quantity"] * tx["UnitPrice"]
-            if min_amount is not None and amount < min_amount:
-                return False
-            if max_amount is not None and amount > max_amount:
-                return False
-            return True
-
-        valid_transactions = [tx for tx in valid_transactions if in_range(tx)]
-        filtered_by_amount = before - len(valid_transactions)
+    if filter_by_amount:
         print("After amount filter:", len(valid_transactions))
 
     filter_summary = {
@@ -244,6 +245,8 @@ def calculate_total_revenue(transactions):
 
     total_revenue = 0.0
 
+    # A plain loop is as fast as sum() over a generator here, and keeps
+    # the same left-to-right float addition as the other analyses
     for tx in transactions:
         total_revenue += tx["Quantity"] * tx["UnitPrice"]
 
@@ -266,28 +269,37 @@ def region_wise_sales(transactions):
 
         total_sales_all_regions += sale_amount
 
-        if region not in region_data:
-            region_data[region] = {
+        # Look the region up once and update its stats in place
+        stats = region_data.get(region)
+        if stats is None:
+            stats = region_data[region] = {
                 "total_sales": 0.0,
                 "transaction_count": 0
             }
 
-        region_data[region]["total_sales"] += sale_amount
-        region_data[region]["transaction_count"] += 1
+        stats["total_sales"] += sale_amount
+        stats["transaction_count"] += 1
 
-    # Second pass: calculate percentage contribution
-    for region in region_data:
-        percentage = (region_data[region]["total_sales"] / total_sales_all_regions) * 100
-        region_data[region]["percentage"] = round(percentage, 2)
+    return _finish_region_stats(region_data, total_sales_all_regions)
 
-    # Sort regions by total_sales descending
-    sorted_region_data = dict(
-        sorted(
-            region_data.items(),
-            key=lambda item: item[1]["total_sales"],
-            reverse=True
-        )
-    )
+def _finish_region_stats(region_data, total_sales_all_regions):
+    """
+    Adds percentage contribution to aggregated region data
+    and sorts regions by total_sales descending
+    """
+
+    # Sort regions by total_sales descending and add each region's
+    # percentage contribution while building the result
+    sorted_region_data = {}
+
+    for region, stats in sorted(
+        region_data.items(),
+        key=lambda item: item[1]["total_sales"],
+        reverse=True
+    ):
+        percentage = (stats["total_sales"] / total_sales_all_regions) * 100
+        stats["percentage"] = round(percentage, 2)
+        sorted_region_data[region] = stats
 
     return sorted_region_data
 
@@ -305,34 +317,48 @@ def top_selling_products(transactions, n=5):
     for tx in transactions:
         product = tx["ProductName"]
         quantity = tx["Quantity"]
-        revenue = tx["Quantity"] * tx["UnitPrice"]
+        revenue = quantity * tx["UnitPrice"]
 
-        if product not in product_data:
-            product_data[product] = {
+        data = product_data.get(product)
+        if data is None:
+            data = product_data[product] = {
                 "total_quantity": 0,
                 "total_revenue": 0.0
             }
 
-        product_data[product]["total_quantity"] += quantity
-        product_data[product]["total_revenue"] += revenue
+        data["total_quantity"] += quantity
+        data["total_revenue"] += revenue
 
-    # Convert to list of tuples
-    product_list = []
-    for product, data in product_data.items():
-        product_list.append(
-            (product, data["total_quantity"], data["total_revenue"])
-        )
+    return _rank_top_products(product_data, n)
 
-    # Sort by total quantity sold (descending)
-    product_list.sort(key=lambda x: x[1], reverse=True)
+def _rank_top_products(product_data, n):
+    """
+    Picks the top n products from aggregated product data
 
-    # Return top n products
-    return product_list[:n]
+    Returns: list of tuples
+    (ProductName, TotalQuantity, TotalRevenue)
+    """
+
+    # Select the top n by total quantity sold (descending) straight
+    # from the aggregates, without sorting them or building a tuple
+    # per product; ties keep their original order
+    top_items = heapq.nlargest(
+        n,
+        product_data.items(),
+        key=lambda item: item[1]["total_quantity"]
+    )
 
-def customer_analysis(transactions):
+    return [
+        (product, data["total_quantity"], data["total_revenue"])
+        for product, data in top_items
+    ]
+
+def customer_analysis(transactions, top_n=None):
     """
     Analyzes customer purchase patterns
 
+    If top_n is given, only the top_n customers by total spent are returned
+
     Returns: dictionary of customer statistics
     """
 
@@ -344,38 +370,52 @@ def customer_analysis(transactions):
         amount = tx["Quantity"] * tx["UnitPrice"]
         product = tx["ProductName"]
 
-        if customer_id not in customer_data:
-            customer_data[customer_id] = {
+        stats = customer_data.get(customer_id)
+        if stats is None:
+            stats = customer_data[customer_id] = {
                 "total_spent": 0.0,
                 "purchase_count": 0,
                 "products_bought": set()
             }
 
-        customer_data[customer_id]["total_spent"] += amount
-        customer_data[customer_id]["purchase_count"] += 1
-        customer_data[customer_id]["products_bought"].add(product)
+        stats["total_spent"] += amount
+        stats["purchase_count"] += 1
+        stats["products_bought"].add(product)
 
-    # Calculate average order value and convert product sets to lists
-    for customer_id in customer_data:
-        total_spent = customer_data[customer_id]["total_spent"]
-        purchase_count = customer_data[customer_id]["purchase_count"]
-
-        customer_data[customer_id]["avg_order_value"] = round(
-            total_spent / purchase_count, 2
-        )
+    return _finish_customer_stats(customer_data, top_n)
 
-        customer_data[customer_id]["products_bought"] = list(
-            customer_data[customer_id]["products_bought"]
-        )
+def _finish_customer_stats(customer_data, top_n=None):
+    """
+    Ranks aggregated customer data by total spent and adds the
+    average order value, keeping only the top_n customers if given
+    """
 
-    # Sort customers by total_spent descending
-    sorted_customer_data = dict(
-        sorted(
+    # Rank customers by total_spent descending; a heap is enough
+    # when only the top few are needed
+    if top_n is None:
+        ranked_customers = sorted(
             customer_data.items(),
             key=lambda item: item[1]["total_spent"],
             reverse=True
         )
-    )
+    else:
+        ranked_customers = heapq.nlargest(
+            top_n,
+            customer_data.items(),
+            key=lambda item: item[1]["total_spent"]
+        )
+
+    # Calculate average order value and convert product sets to lists
+    sorted_customer_data = {}
+
+    for customer_id, stats in ranked_customers:
+        stats["avg_order_value"] = round(
+            stats["total_spent"] / stats["purchase_count"], 2
+        )
+
+        stats["products_bought"] = list(stats["products_bought"])
+
+        sorted_customer_data[customer_id] = stats
 
     return sorted_customer_data
 
@@ -394,26 +434,34 @@ def daily_sales_trend(transactions):
         amount = tx["Quantity"] * tx["UnitPrice"]
         customer = tx["CustomerID"]
 
-        if date not in daily_data:
-            daily_data[date] = {
+        stats = daily_data.get(date)
+        if stats is None:
+            stats = daily_data[date] = {
                 "revenue": 0.0,
                 "transaction_count": 0,
                 "customers": set()
             }
 
-        daily_data[date]["revenue"] += amount
-        daily_data[date]["transaction_count"] += 1
-        daily_data[date]["customers"].add(customer)
+        stats["revenue"] += amount
+        stats["transaction_count"] += 1
+        stats["customers"].add(customer)
+
+    return _finish_daily_trend(daily_data)
 
-    # Prepare final output and sort chronologically by date
+def _finish_daily_trend(daily_data):
+    """
+    Converts aggregated daily data into the daily trend format,
+    sorted chronologically by date
+    """
+
+    # Replace each customer set with its size in place, releasing
+    # the set as soon as it has been counted, then sort by date
     sorted_daily_data = {}
 
-    for date in sorted(daily_data.keys()):
-        sorted_daily_data[date] = {
-            "revenue": daily_data[date]["revenue"],
-            "transaction_count": daily_data[date]["transaction_count"],
-            "unique_customers": len(daily_data[date]["customers"])
-        }
+    for date in sorted(daily_data):
+        stats = daily_data[date]
+        stats["unique_customers"] = len(stats.pop("customers"))
+        sorted_daily_data[date] = stats
 
     return sorted_daily_data
 
@@ -426,32 +474,37 @@ def find_peak_sales_day(transactions):
 
     daily_totals = {}
 
-    # Aggregate revenue and transaction count by date
+    # Aggregate [revenue, transaction_count] by date
     for tx in transactions:
         date = tx["Date"]
         amount = tx["Quantity"] * tx["UnitPrice"]
 
-        if date not in daily_totals:
-            daily_totals[date] = {
-                "revenue": 0.0,
-                "transaction_count": 0
-            }
+        totals = daily_totals.get(date)
+        if totals is None:
+            totals = daily_totals[date] = [0.0, 0]
 
-        daily_totals[date]["revenue"] += amount
-        daily_totals[date]["transaction_count"] += 1
+        totals[0] += amount
+        totals[1] += 1
 
-    # Find the date with maximum revenue
-    peak_date = None
-    peak_revenue = 0.0
-    peak_tx_count = 0
+    return _pick_peak_day(
+        (date, totals[0], totals[1]) for date, totals in daily_totals.items()
+    )
 
-    for date, stats in daily_totals.items():
-        if stats["revenue"] > peak_revenue:
-            peak_revenue = stats["revenue"]
-            peak_tx_count = stats["transaction_count"]
-            peak_date = date
+def _pick_peak_day(day_totals):
+    """
+    Finds the date with maximum revenue among (date, revenue, transaction_count)
+    tuples; the first such date wins ties
 
-    return (peak_date, peak_revenue, peak_tx_count)
+    Returns: tuple (date, revenue, transaction_count),
+    or (None, 0.0, 0) if no day has positive revenue
+    """
+
+    peak = max(day_totals, key=lambda day: day[1], default=None)
+
+    if peak is None or peak[1] <= 0.0:
+        return (None, 0.0, 0)
+
+    return peak
 
 def low_performing_products(transactions, threshold=10):
     """
@@ -467,16 +520,27 @@ def low_performing_products(transactions, threshold=10):
     for tx in transactions:
         product = tx["ProductName"]
         quantity = tx["Quantity"]
-        revenue = tx["Quantity"] * tx["UnitPrice"]
+        revenue = quantity * tx["UnitPrice"]
 
-        if product not in product_data:
-            product_data[product] = {
+        data = product_data.get(product)
+        if data is None:
+            data = product_data[product] = {
                 "total_quantity": 0,
                 "total_revenue": 0.0
             }
 
-        product_data[product]["total_quantity"] += quantity
-        product_data[product]["total_revenue"] += revenue
+        data["total_quantity"] += quantity
+        data["total_revenue"] += revenue
+
+    return _pick_low_products(product_data, threshold)
+
+def _pick_low_products(product_data, threshold):
+    """
+    Picks products below the quantity threshold from aggregated product data
+
+    Returns: list of tuples
+    (ProductName, TotalQuantity, TotalRevenue)
+    """
 
     # Filter products below threshold
     low_products = []
@@ -492,6 +556,98 @@ def low_performing_products(transactions, threshold=10):
 
     return low_products
 
+def analyze_sales(transactions, n=5, threshold=10, top_customers=None):
+    """
+    Runs the revenue, region, product, customer and daily analyses
+    in a single pass, computing each transaction amount only once
+
+    Returns: dictionary with keys
+    'total_revenue' - same as calculate_total_revenue
+    'region_stats'  - same as region_wise_sales
+    'top_products'  - same as top_selling_products(transactions, n)
+    'low_products'  - same as low_performing_products(transactions, threshold)
+    'customer_stats' - same as customer_analysis(transactions, top_customers)
+    'daily_trend'   - same as daily_sales_trend
+    'peak_day'      - same as find_peak_sales_day
+    """
+
+    region_data = {}
+    product_data = {}
+    customer_data = {}
+    daily_data = {}
+    total_sales_all_regions = 0.0
+
+    # One pass fills the region, product, customer and date groups together;
+    # only the finishing helpers are shared, so the accumulation below must
+    # be kept in sync with region_wise_sales, top_selling_products,
+    # low_performing_products, customer_analysis and daily_sales_trend
+    for tx in transactions:
+        region = tx["Region"]
+        product = tx["ProductName"]
+        customer = tx["CustomerID"]
+        date = tx["Date"]
+        quantity = tx["Quantity"]
+        amount = quantity * tx["UnitPrice"]
+
+        total_sales_all_regions += amount
+
+        region_stats = region_data.get(region)
+        if region_stats is None:
+            region_stats = region_data[region] = {
+                "total_sales": 0.0,
+                "transaction_count": 0
+            }
+
+        region_stats["total_sales"] += amount
+        region_stats["transaction_count"] += 1
+
+        product_stats = product_data.get(product)
+        if product_stats is None:
+            product_stats = product_data[product] = {
+                "total_quantity": 0,
+                "total_revenue": 0.0
+            }
+
+        product_stats["total_quantity"] += quantity
+        product_stats["total_revenue"] += amount
+
+        customer_stats = customer_data.get(customer)
+        if customer_stats is None:
+            customer_stats = customer_data[customer] = {
+                "total_spent": 0.0,
+                "purchase_count": 0,
+                "products_bought": set()
+            }
+
+        customer_stats["total_spent"] += amount
+        customer_stats["purchase_count"] += 1
+        customer_stats["products_bought"].add(product)
+
+        day_stats = daily_data.get(date)
+        if day_stats is None:
+            day_stats = daily_data[date] = {
+                "revenue": 0.0,
+                "transaction_count": 0,
+                "customers": set()
+            }
+
+        day_stats["revenue"] += amount
+        day_stats["transaction_count"] += 1
+        day_stats["customers"].add(customer)
+
+    return {
+        "total_revenue": total_sales_all_regions,
+        "region_stats": _finish_region_stats(region_data, total_sales_all_regions),
+        "top_products": _rank_top_products(product_data, n),
+        "low_products": _pick_low_products(product_data, threshold),
+        "customer_stats": _finish_customer_stats(customer_data, top_customers),
+        "peak_day": _pick_peak_day(
+            (date, day_stats["revenue"], day_stats["transaction_count"])
+            for date, day_stats in daily_data.items()
+        ),
+        "daily_trend": _finish_daily_trend(daily_data)
+    }
+
 def save_enriched_data(enriched_transactions, filename='data/enriched_sales_data.txt'):
     """
     Saves enriched transactions back to file
@@ -508,9 +664,12 @@ def save_enriched_data(enriched_transactions, filename='data/enriched_sales_data
     ]
 
     try:
-        with open(filename, 'w', encoding='utf-8') as file:
+        with open(filename, 'w', encoding='utf-8', buffering=1024 * 1024) as file:
             file.write('|'.join(headers) + '\n')
 
+            # Rows are written one at a time; the 1 MB buffer already
+            # batches them into large writes, and measured faster than
+            # joining the whole file in memory first
             for tx in enriched_transactions:
                 row = []
                 for h in headers:
@@ -534,33 +693,66 @@ def enrich_sales_data(transactions, product_mapping):
 
     enriched_transactions = []
 
+    # API fields for products with no match in the mapping
+    unmatched_fields = {
+        'API_Category': None,
+        'API_Brand': None,
+        'API_Rating': None,
+        'API_Match': False
+    }
+
+    # ProductID -> API fields to add, resolved once per distinct ID
+    resolved_fields = {}
+
     for tx in transactions:
-        enriched_tx = tx.copy()
         product_id_str = tx.get("ProductID", "")
+        api_fields = resolved_fields.get(product_id_str)
 
-        try:
-            numeric_id = int(product_id_str.replace('P', ''))
-        except ValueError:
-            numeric_id = None
-
-        if numeric_id and numeric_id in product_mapping:
-            api_product = product_mapping[numeric_id]
-            enriched_tx['API_Category'] = api_product.get('category')
-            enriched_tx['API_Brand'] = api_product.get('brand')
-            enriched_tx['API_Rating'] = api_product.get('rating')
-            enriched_tx['API_Match'] = True
-        else:
-            enriched_tx['API_Category'] = None
-            enriched_tx['API_Brand'] = None
-            enriched_tx['API_Rating'] = None
-            enriched_tx['API_Match'] = False
+        if api_fields is None:
+            try:
+                numeric_id = int(product_id_str.replace('P', ''))
+            except ValueError:
+                numeric_id = None
+
+            # One lookup decides the match and fetches the product
+            api_product = product_mapping.get(numeric_id) if numeric_id else None
+
+            if api_product is not None:
+                api_fields = {
+                    'API_Category': api_product.get('category'),
+                    'API_Brand': api_product.get('brand'),
+                    'API_Rating': api_product.get('rating'),
+                    'API_Match': True
+                }
+            else:
+                api_fields = unmatched_fields
 
-        enriched_transactions.append(enriched_tx)
+            resolved_fields[product_id_str] = api_fields
+
+        # Copy the transaction and add the API fields in one merge
+        enriched_transactions.append({**tx, **api_fields})
 
     # IMPORTANT: Save enriched data to file
     save_enriched_data(enriched_transactions)
 
     return enriched_transactions
 
+def summarize_enrichment(enriched_transactions):
+    """
+    Counts successful enrichments and collects products that had no API match
 
+    Returns: tuple (success_count, failed_products)
+    where failed_products is a set of ProductName values
+    """
+
+    success_count = 0
+    failed_products = set()
+
+    # Single pass: count matches and remember unmatched product names
+    for tx in enriched_transactions:
+        if tx.get("API_Match"):
+            success_count += 1
+        else:
+            failed_products.add(tx.get("ProductName"))
 
+    return success_count, failed_products
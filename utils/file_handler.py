@@ -1,3 +1,6 @@
+import codecs
+import mmap
+
 def read_sales_data(filename):
     """
     Reads sales data from file handling encoding issues
@@ -15,38 +18,65 @@ def read_sales_data(filename):
     - Remove empty lines
     """
 
-    encodings = ['utf-8', 'latin-1', 'cp1252']
+    # Map the file once instead of copying it into a bytes object;
+    # each encoding is then decoded straight from the mapped pages
+    try:
+        with open(filename, 'rb') as file:
+            try:
+                raw = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Empty or non-regular files cannot be mapped
+                raw = file.read()
 
-    for encoding in encodings:
-        try:
-            with open(filename, 'r', encoding=encoding) as file:
-                lines = file.readlines()
+    except FileNotFoundError:
+        print("Error: Sales data file not found.")
+        return []
+
+    try:
+        return _decode_lines(raw)
 
-            cleaned_lines = []
+    finally:
+        # Unmap the file as soon as its lines have been extracted
+        if isinstance(raw, mmap.mmap):
+            raw.close()
 
-            for line in lines:
-                line = line.strip()
+def _decode_lines(raw):
+    """
+    Decodes raw file data with the first supported encoding that works
 
-                # Skip empty lines
-                if line == "":
-                    continue
+    Returns: list of stripped lines without empty lines and the header
+    """
 
-                # Skip header
-                if line.startswith("TransactionID"):
-                    continue
+    # Strict decoding stops at the first invalid byte, and latin-1 maps
+    # every byte, so a file is decoded at most twice; errors='replace'
+    # is not used because it would corrupt latin-1 product names
+    encodings = ['utf-8', 'latin-1', 'cp1252']
 
-                cleaned_lines.append(line)
+    # Drop a UTF-8 byte order mark instead of leaving it on the header line;
+    # utf-8-sig takes the place of utf-8, which would fail at the same byte
+    if raw[:3] == codecs.BOM_UTF8:
+        encodings[0] = 'utf-8-sig'
 
-            print(f"File read successfully using encoding: {encoding}")
-            return cleaned_lines
+    for encoding in encodings:
+        try:
+            text = str(raw, encoding)
 
         except UnicodeDecodeError:
             # Try next encoding
             continue
 
-        except FileNotFoundError:
-            print("Error: Sales data file not found.")
-            return []
+        # Same line endings as text mode: \r\n and \r both end a line
+        lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+
+        # Strip each line, then skip empty lines and the header
+        cleaned_lines = [
+            line
+            for line in map(str.strip, lines)
+            if line and not line.startswith("TransactionID")
+        ]
+
+        print(f"File read successfully using encoding: {encoding}")
+        return cleaned_lines
 
     # If all encodings fail
     print("Error: Unable to read file with supported encodings.")